@@ -2,7 +2,7 @@
 """
 Read variable assignments from stdin (like output of your C++ program) and plot:
  - 2D scatter of x,y with centroids and AoA arrows when present
- - 3D scatter of x,y,rssi colored by RSSI when present
+ - 3D scatter of x,y,rssi colored by RSSI when present (a flat 2D RSSI scatter when only saving)
 
 Usage:
   ./build/signal-triangulation | python3 plot_from_stdin.py
@@ -10,6 +10,11 @@ Usage:
 Options:
   --no-show       Do not show interactive windows (only save PNGs)
   --out-prefix P  Save files as P_2d.png and P_3d.png (default: plots)
+  --no-path       Do not draw the path connecting the measurement points
+  --rssi-3d       With --no-show, keep the 3D RSSI plot instead of the flat 2D one
+  --contour       Draw the cost heatmaps with filled contours instead of a (faster) image
+  --batch         Write PNGs with light compression (faster, larger files)
+  --server SOCK   Stay resident and plot each document sent to Unix socket SOCK
 
 The script ignores latitude/longitude lines ("Lat=..." / "Lon=...").
 """
@@ -17,60 +22,153 @@ The script ignores latitude/longitude lines ("Lat=..." / "Lon=...").
 import sys
 import re
 import ast
+import io
+import warnings
+from operator import itemgetter
 from typing import Dict, Any
-import matplotlib.pyplot as plt
 import numpy as np
-from mpl_toolkits.mplot3d import Axes3D
-import pandas as pd
+
+# matplotlib is imported on first use by _import_pyplot(), so runs that never plot don't pay for it;
+# each plot_* function fetches it from there, so they also work when called directly
+plt = None
+
+_NUMBER = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|[+-]?(?:nan|inf)"
+_CLUSTER_HEADER_RE = re.compile(r"^[ \t]*Cluster[ \t]+(\d+)[ \t]*:(.*)$", re.M)
+_CLUSTER_KV_RE = re.compile(r"([A-Za-z_]+)\s*:\s*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)")
+_CLUSTER_POINT_RE = re.compile(rf"^[ \t]*p [ \t]*({_NUMBER})[ \t]+({_NUMBER})(?=\s|$)", re.M)
+_BLANK_LINE_RE = re.compile(r"^[ \t\r]*$", re.M)
+_CLUSTER_FLOAT_FIELDS = frozenset(('centroid_x', 'centroid_y', 'avg_rssi', 'estimated_aoa', 'ratio', 'weight'))
+_CENTROID_FIELDS = itemgetter('centroid_x', 'centroid_y', 'estimated_aoa', 'weight')
+_LIST_START_RE = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\s*=\s*\[")
+_BRACKET_RE = re.compile(r"[\[\]]")
+# section headers, matched on whole lines so the buffer is never split up front
+_SEARCH_SPACE_HEADER_RE = re.compile(r"^[^\S\n]*Search Space Costs:[^\S\n]*$", re.M)
+# cost rows always start with a number, so the section can't extend past the first line that doesn't
+_SEARCH_SPACE_END_RE = re.compile(r"\n(?![^\S\n]*[-+.\dnNiI])")
+_DATA_POINTS_HEADER_RE = re.compile(r"^[^\S\n]*data points:.*$", re.M | re.I)
+# [^\S\n] instead of \s so that findall() over a whole block never matches across lines
+_DATA_POINT_RE = re.compile(
+    r"x[^\S\n]*:[^\S\n]*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)[^\S\n]*,[^\S\n]*y[^\S\n]*:[^\S\n]*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)"
+    r"[^\S\n]*,[^\S\n]*rssi[^\S\n]*:[^\S\n]*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)")
+# a blank line or the Clusters: header ends the data points; the leading \n keeps this a fast literal scan
+_DATA_POINTS_END_RE = re.compile(r"\n[^\S\n]*(?:\n|\Z|clusters:)", re.I)
+_RESULT_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"Resulting point[^\n\r]*x\s*=\s*([+-]?\d+\.?\d*)\s*,\s*y\s*=\s*([+-]?\d+\.?\d*)",
+    r"Resulting point[^\n\r]*:\s*x\s*=\s*([+-]?\d+\.?\d*)\s*,\s*y\s*=\s*([+-]?\d+\.?\d*)",
+    r"x\s*=\s*([+-]?\d+\.?\d*)\s*,\s*y\s*=\s*([+-]?\d+\.?\d*)\s*#?\s*Resulting",
+)]
+_SOURCE_PATTERNS = [re.compile(p) for p in (
+    r"Source position from file:\s*x\s*=\s*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)\s*,?\s*y\s*=\s*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)",
+)]
+
+# Above this many measurement points plot_2d renders a hexbin density instead of a scatter
+HEXBIN_THRESHOLD = 50_000
+# Above this many measurement points the measurement path is not drawn (it is just clutter at that density)
+PATH_MAX_POINTS = 5_000
+# Extra Pillow options for every saved PNG; --batch trades file size for much faster zlib compression
+PNG_OPTIONS: Dict[str, Any] = {}
+# path.simplify_threshold (in pixels) for save-only runs
+SAVE_SIMPLIFY_THRESHOLD = 0.5
+# plot_clusters only draws centroid labels while at most this many clusters are in view
+MAX_CLUSTER_LABELS = 50
+# plot_clusters lists at most this many clusters in its legend (tab10 repeats its colours after 10 anyway)
+MAX_LEGEND_CLUSTERS = 10
+
+def _import_pyplot(show: bool = True):
+    """Import matplotlib.pyplot once, picking the non-GUI Agg backend (tuned for saving) when nothing will be shown."""
+    global plt
+    if plt is None:
+        import matplotlib
+        if not show:
+            matplotlib.use('Agg')
+            # saved images are never zoomed, so let Agg simplify long paths harder and draw them in chunks;
+            # 0.5 px (default 1/9) merges sub-pixel jitter but keeps visible turns, where 1.0 flattens them
+            matplotlib.rcParams['path.simplify'] = True
+            matplotlib.rcParams['path.simplify_threshold'] = SAVE_SIMPLIFY_THRESHOLD
+            matplotlib.rcParams['agg.path.chunksize'] = 10000
+        import matplotlib.pyplot
+        plt = matplotlib.pyplot
+    return plt
+
+def _cost_rows(block: str):
+    """Parse `x,y,cost` lines up to the first one that isn't three numbers, as an (n, 3) array."""
+    data = []
+    for line in block.splitlines():
+        parts = line.split(',')
+        if len(parts) != 3:
+            break
+        try:
+            data.append((float(parts[0]), float(parts[1]), float(parts[2])))
+        except ValueError:
+            break # Stop at non-numeric line
+    return np.array(data, dtype=np.float64).reshape(-1, 3)
 
 def parse_search_space_costs(text: str):
     """
     Parse the 'Search Space Costs:' section.
     Returns X, Y, Z arrays for plotting, or None if not found.
     """
-    lines = text.splitlines()
-    start_idx = -1
-    for i, line in enumerate(lines):
-        if line.strip() == "Search Space Costs:":
-            start_idx = i + 1
-            break
-    
-    if start_idx == -1:
+    m = _SEARCH_SPACE_HEADER_RE.search(text)
+    if m is None:
         return None, None, None
 
-    data = []
-    for line in lines[start_idx:]:
-        parts = line.split(',')
-        if len(parts) == 3:
-            try:
-                x = float(parts[0])
-                y = float(parts[1])
-                cost = float(parts[2])
-                data.append((x, y, cost))
-            except ValueError:
-                break # Stop at non-numeric line
-        else:
-            break
-            
-    if not data:
+    stop = _SEARCH_SPACE_END_RE.search(text, m.end())
+    block = text[m.end() + 1:stop.start() if stop else len(text)]
+    data = None
+    if block:
+        # numpy parses the whole block in C; it refuses any row that float() would reject too
+        try:
+            data = np.loadtxt(io.StringIO(block), delimiter=',', comments=None, ndmin=2)
+        except ValueError:
+            pass
+    if data is None or data.shape[1] != 3:
+        # some row is malformed: the section really ends there
+        data = _cost_rows(block)
+    if not len(data):
         return None, None, None
 
-    # Convert to numpy arrays and pivot
+    # Pivot into a grid: rows follow the sorted y values, columns the sorted x values
     try:
-        df = pd.DataFrame(data, columns=['x', 'y', 'cost'])
-        pivot = df.pivot(index='y', columns='x', values='cost')
-        X = pivot.columns.values
-        Y = pivot.index.values
-        X, Y = np.meshgrid(X, Y)
-        Z = pivot.values
+        xs, ix = np.unique(data[:, 0], return_inverse=True)
+        ys, iy = np.unique(data[:, 1], return_inverse=True)
+        cells = iy * len(xs) + ix
+        if np.bincount(cells).max() > 1:
+            raise ValueError("Index contains duplicate entries, cannot reshape")
+        # cells the search never evaluated stay NaN
+        Z = np.full((len(ys), len(xs)), np.nan)
+        Z.flat[cells] = data[:, 2]
+        X, Y = np.meshgrid(xs, ys)
         return X, Y, Z
     except Exception as e:
         print(f"Error processing search space data: {e}")
         return None, None, None
 
-def plot_heatmap(X, Y, Z, out_dir=None, show=True):
+def _nearest_index(axis, values):
+    """Index of the entry of the ascending array axis closest to each of values (the first one on ties)."""
+    hi = np.minimum(np.searchsorted(axis, values), len(axis) - 1)
+    lo = np.maximum(hi - 1, 0)
+    return np.where(np.abs(values - axis[lo]) <= np.abs(axis[hi] - values), lo, hi)
+
+def _cost_map(ax, X, Y, Z, contour=False, **kwargs):
+    """Draw the cost grid on ax and return the mappable for its colorbar.
+
+    By default the grid is blitted as an image, which is far cheaper than contouring it;
+    contour=True draws the 50-level filled contours instead.
+    """
+    if contour:
+        return ax.contourf(X, Y, Z, levels=50, cmap='viridis', **kwargs)
+    # pixel centres sit on the grid nodes, so pad the extent by half a cell on each side
+    x_axis = X[0, :]
+    y_axis = Y[:, 0]
+    dx = (x_axis[-1] - x_axis[0]) / (len(x_axis) - 1) if len(x_axis) > 1 else 1.0
+    dy = (y_axis[-1] - y_axis[0]) / (len(y_axis) - 1) if len(y_axis) > 1 else 1.0
+    extent = (x_axis[0] - dx / 2, x_axis[-1] + dx / 2, y_axis[0] - dy / 2, y_axis[-1] + dy / 2)
+    return ax.imshow(Z, extent=extent, origin='lower', aspect='auto', cmap='viridis', interpolation='bilinear', **kwargs)
+
+def plot_heatmap(X, Y, Z, out_dir=None, show=True, contour=False):
+    plt = _import_pyplot(show)
     fig, ax = plt.subplots(figsize=(10, 8))
-    cp = ax.contourf(X, Y, Z, levels=50, cmap='viridis')
+    cp = _cost_map(ax, X, Y, Z, contour=contour)
     fig.colorbar(cp, label='Cost')
     ax.set_title('Search Space Cost Landscape (Heatmap)')
     ax.set_xlabel('X (meters)')
@@ -79,13 +177,16 @@ def plot_heatmap(X, Y, Z, out_dir=None, show=True):
     
     if out_dir:
         output_file = f"{out_dir}/search_space_heatmap.png"
-        fig.savefig(output_file, dpi=200)
+        fig.savefig(output_file, dpi=200, pil_kwargs=PNG_OPTIONS)
         print(f"Saved heatmap to {output_file}")
     
     if show:
         plt.show()
+    # release the figure (and its point data) before the next plot is built
+    plt.close(fig)
 
 def plot_3d_surface(X, Y, Z, out_dir=None, show=True):
+    plt = _import_pyplot(show)
     fig = plt.figure(figsize=(12, 9))
     ax = fig.add_subplot(111, projection='3d')
     surf = ax.plot_surface(X, Y, Z, cmap='viridis', edgecolor='none', alpha=0.8)
@@ -97,42 +198,48 @@ def plot_3d_surface(X, Y, Z, out_dir=None, show=True):
     
     if out_dir:
         output_file = f"{out_dir}/search_space_3d.png"
-        fig.savefig(output_file, dpi=200)
+        fig.savefig(output_file, dpi=200, pil_kwargs=PNG_OPTIONS)
         print(f"Saved 3D surface plot to {output_file}")
     
     if show:
         plt.show()
+    plt.close(fig)
 
-def plot_composite_heatmap(X, Y, Z, data_x, data_y, centroids=None, aoas=None, weights=None, result_point=None, source_point=None, out_dir=None, show=True):
+def _aoa_vectors(angles_deg, length):
+    """Arrow components (dxs, dys) of the given length pointing along each AoA (degrees)."""
+    # one complex exponential computes cos and sin together; .real/.imag are views
+    z = length * np.exp(1j * np.deg2rad(angles_deg))
+    return z.real, z.imag
+
+def plot_composite_heatmap(X, Y, Z, data_x, data_y, centroids=None, aoas=None, weights=None, result_point=None, source_point=None, out_dir=None, show=True, contour=False):
+    plt = _import_pyplot(show)
     fig, ax = plt.subplots(figsize=(12, 10))
     
     # 1. The Cost Heatmap
     # Use a lighter alpha so points show up
-    cp = ax.contourf(X, Y, Z, levels=50, cmap='viridis', alpha=0.9)
+    cp = _cost_map(ax, X, Y, Z, contour=contour, alpha=0.9)
     fig.colorbar(cp, label='Cost')
     
     # 2. Data Points (measurements) - subtle white dots
     if data_x is not None and data_y is not None:
-        ax.scatter(data_x, data_y, c='black', s=15, alpha=0.4, label='measurements', edgecolors='none')
+        ax.plot(data_x, data_y, 'o', color='black', markersize=np.sqrt(15), markeredgewidth=0, alpha=0.4, label='measurements', rasterized=True)
 
     # 3. Centroids and AoA
     if centroids is not None:
         cx, cy = centroids
-        cx = np.array(cx)
-        cy = np.array(cy)
+        cx = np.asarray(cx)
+        cy = np.asarray(cy)
         # Plot centroids
         ax.scatter(cx, cy, marker='X', c='red', s=120, edgecolors='white', linewidth=1.5, label='centroids', zorder=5)
         
         if aoas is not None:
-            angles = np.array(aoas)
+            angles = np.asarray(aoas)
             # compute arrow length based on grid extent
-            xr = np.max(X) - np.min(X)
-            yr = np.max(Y) - np.min(Y)
+            xr = np.ptp(X)
+            yr = np.ptp(Y)
             extent = max(xr, yr)
             arrow_len = extent * 0.1
-            rads = np.deg2rad(angles)
-            dxs = arrow_len * np.cos(rads)
-            dys = arrow_len * np.sin(rads)
+            dxs, dys = _aoa_vectors(angles, arrow_len)
             
             # Quiver for AoA
             ax.quiver(cx, cy, dxs, dys, angles='xy', scale_units='xy', scale=1, color='red', width=0.006, headwidth=4, zorder=4)
@@ -160,13 +267,15 @@ def plot_composite_heatmap(X, Y, Z, data_x, data_y, centroids=None, aoas=None, w
     
     if out_dir:
         output_file = f"{out_dir}/composite_heatmap.png"
-        fig.savefig(output_file, dpi=200)
+        fig.savefig(output_file, dpi=200, pil_kwargs=PNG_OPTIONS)
         print(f"Saved composite heatmap to {output_file}")
     
     if show:
         plt.show()
+    plt.close(fig)
 
 def plot_composite_3d_surface(X, Y, Z, result_point=None, source_point=None, out_dir=None, show=True):
+    plt = _import_pyplot(show)
     fig = plt.figure(figsize=(12, 9))
     ax = fig.add_subplot(111, projection='3d')
     
@@ -174,30 +283,29 @@ def plot_composite_3d_surface(X, Y, Z, result_point=None, source_point=None, out
     surf = ax.plot_surface(X, Y, Z, cmap='viridis', edgecolor='none', alpha=0.6)
     fig.colorbar(surf, ax=ax, shrink=0.5, aspect=5, label='Cost')
     
-    # Helper to find Z for a given (x,y)
-    def get_z(px, py):
-        # X[0, :] are x coordinates, Y[:, 0] are y coordinates
-        x_axis = X[0, :]
-        y_axis = Y[:, 0]
-        idx_x = (np.abs(x_axis - px)).argmin()
-        idx_y = (np.abs(y_axis - py)).argmin()
-        return Z[idx_y, idx_x]
+    # X[0, :] are x coordinates, Y[:, 0] are y coordinates, both ascending
+    x_axis = X[0, :]
+    y_axis = Y[:, 0]
+
+    # Helper to find Z for given (x, y) arrays
+    def get_z(pxs, pys):
+        return Z[_nearest_index(y_axis, pys), _nearest_index(x_axis, pxs)]
 
+    markers = []
     if result_point is not None:
-        rx, ry = result_point
-        try:
-            rz = get_z(rx, ry)
-            ax.scatter([rx], [ry], [rz], c='gold', marker='*', s=200, edgecolors='black', label='result', zorder=10)
-        except Exception as e:
-            print(f"Warning: Could not plot result point at ({rx}, {ry}): {e}")
-        
+        markers.append((result_point, dict(c='gold', marker='*', s=200, label='result')))
     if source_point is not None:
-        sx, sy = source_point
+        markers.append((source_point, dict(c='cyan', marker='P', s=150, label='source')))
+    if markers:
+        # look every marker's height up in one batched query
         try:
-            sz = get_z(sx, sy)
-            ax.scatter([sx], [sy], [sz], c='cyan', marker='P', s=150, edgecolors='black', label='source', zorder=10)
+            pxs, pys = np.array([p for p, _ in markers], dtype=np.float64).T
+            pzs = get_z(pxs, pys)
         except Exception as e:
-            print(f"Warning: Could not plot source point at ({sx}, {sy}): {e}")
+            print(f"Warning: Could not place result/source points on the cost surface: {e}")
+        else:
+            for px, py, pz, (_, style) in zip(pxs, pys, pzs, markers):
+                ax.scatter([px], [py], [pz], edgecolors='black', zorder=10, **style)
 
     ax.set_title('Composite 3D Cost Surface')
     ax.set_xlabel('X (meters)')
@@ -207,22 +315,62 @@ def plot_composite_3d_surface(X, Y, Z, result_point=None, source_point=None, out
 
     if out_dir:
         output_file = f"{out_dir}/composite_3d.png"
-        fig.savefig(output_file, dpi=200)
+        fig.savefig(output_file, dpi=200, pil_kwargs=PNG_OPTIONS)
         print(f"Saved composite 3D plot to {output_file}")
     
     if show:
         plt.show()
+    plt.close(fig)
+
+def _parse_numeric_list(body: str):
+    """Parse the comma-separated body of a flat numeric list into a float64 array.
+    Returns None when the body is empty or not purely numeric.
+    """
+    if not body.strip():
+        return None
+    with warnings.catch_warnings():
+        # numpy only warns (and truncates) when it cannot consume the whole string
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            return np.fromstring(body, dtype=np.float64, sep=',')
+        except (ValueError, DeprecationWarning):
+            return None
+
+
+def _matching_bracket(text: str, open_idx: int) -> int:
+    """Return the index of the ']' closing the '[' at open_idx, or -1 if it is never closed."""
+    depth = 0
+    for b in _BRACKET_RE.finditer(text, open_idx):
+        depth += 1 if b.group() == '[' else -1
+        if depth == 0:
+            return b.start()
+    return -1
+
 
 def parse_lists_from_text(text: str) -> Dict[str, Any]:
-    """Find variable assignments of the form `name = [ ... ]` and return Python lists.
+    """Find variable assignments of the form `name = [ ... ]` and return their values.
+    Flat numeric lists are returned as float64 numpy arrays, anything else as Python lists.
     Case-insensitive for name matching; keys returned in lower-case.
     """
     result = {}
-    # regex to find name = [ ... ] (non-greedy inside brackets)
-    pattern = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(\[[^\]]*\])", re.S)
-    for m in pattern.finditer(text):
+    pos = 0
+    while True:
+        m = _LIST_START_RE.search(text, pos)
+        if m is None:
+            break
         name = m.group(1)
-        raw = m.group(2)
+        end = _matching_bracket(text, m.end() - 1)
+        if end == -1:
+            # unbalanced brackets: look for the next assignment instead
+            pos = m.end()
+            continue
+        pos = end + 1
+        raw = text[m.end() - 1:end + 1]
+        # fast path: numeric lists are parsed by numpy in a single call
+        arr = _parse_numeric_list(raw[1:-1])
+        if arr is not None:
+            result[name.lower()] = arr
+            continue
         # try to safely evaluate the list
         try:
             # ast.literal_eval can parse trailing commas fine
@@ -250,103 +398,73 @@ def parse_clusters_from_text(text: str):
     Returns a list of dicts with keys: id, centroid_x, centroid_y, avg_rssi, estimated_aoa, ratio, num_points, points
     """
     clusters = []
-    cur = None
-    cur_points = []
-    header_re = re.compile(r"^\s*Cluster\s+(\d+)\s*:\s*(.*)$")
-    kv_re = re.compile(r"([A-Za-z_]+)\s*:\s*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)")
-
-    for raw in text.splitlines():
-        line = raw.rstrip()
-        if not line.strip():
-            # blank line ends current cluster
-            if cur is not None:
-                cur['points'] = cur_points
-                clusters.append(cur)
-                cur = None
-                cur_points = []
-            continue
+    headers = list(_CLUSTER_HEADER_RE.finditer(text))
+    for i, m in enumerate(headers):
+        cur = {'id': int(m.group(1)), 'centroid_x': 0.0, 'centroid_y': 0.0,
+               'avg_rssi': None, 'estimated_aoa': None, 'ratio': None, 'num_points': None, 'weight': None}
+        # later occurrences of a key win, as with sequential assignment
+        for k, v in _CLUSTER_KV_RE.findall(m.group(2)):
+            if k in _CLUSTER_FLOAT_FIELDS:
+                cur[k] = float(v)
+            elif k == 'num_points':
+                cur[k] = int(float(v))
+
+        # the cluster body runs until the next header or the first blank line
+        body_start = m.end()
+        body_end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        blank = _BLANK_LINE_RE.search(text, body_start, body_end)
+        if blank:
+            body_end = blank.start()
+        pairs = _CLUSTER_POINT_RE.findall(text, body_start, body_end)
+        # numpy converts all coordinate strings in one call
+        cur['points'] = np.array(pairs, dtype=np.float64).reshape(-1, 2)
+        clusters.append(cur)
+    return clusters
 
-        m = header_re.match(line)
-        if m:
-            # commit previous cluster if any
-            if cur is not None:
-                cur['points'] = cur_points
-                clusters.append(cur)
-                cur_points = []
-            cid = int(m.group(1))
-            rest = m.group(2)
-            cur = {'id': cid, 'centroid_x': 0.0, 'centroid_y': 0.0,
-                   'avg_rssi': None, 'estimated_aoa': None, 'ratio': None, 'num_points': None, 'weight': None}
-            for kv in kv_re.finditer(rest):
-                k = kv.group(1)
-                v = kv.group(2)
-                try:
-                    fv = float(v)
-                except Exception:
-                    continue
-                if k == 'centroid_x': cur['centroid_x'] = fv
-                elif k == 'centroid_y': cur['centroid_y'] = fv
-                elif k == 'avg_rssi': cur['avg_rssi'] = fv
-                elif k == 'estimated_aoa': cur['estimated_aoa'] = fv
-                elif k == 'ratio': cur['ratio'] = fv
-                elif k == 'weight': cur['weight'] = fv
-                elif k == 'num_points': cur['num_points'] = int(fv)
-            continue
 
-        # point line: starts with 'p ' then x y
-        if line.lstrip().startswith('p '):
-            parts = line.split()
-            if len(parts) >= 3 and cur is not None:
-                try:
-                    x = float(parts[1]); y = float(parts[2])
-                    cur_points.append((x, y))
-                except Exception:
-                    continue
+def _labelled_rows(block: str):
+    """Fast path for a block written exactly as `x: .., y: .., rssi: ..` lines, as the program prints it.
 
-    if cur is not None:
-        cur['points'] = cur_points
-        clusters.append(cur)
-    return clusters
+    Strips the labels and lets numpy parse the remaining CSV in C. Returns an (n, 3) array,
+    or None if any line deviates from that layout (the caller then falls back to the regex).
+    """
+    n = block.count('\n') + 1
+    if not block.count('x:') == block.count('y:') == block.count('rssi:') == n:
+        return None
+    try:
+        pts = np.loadtxt(io.StringIO(block.replace('x:', '').replace('y:', '').replace('rssi:', '')),
+                         delimiter=',', comments=None, ndmin=2)
+    except ValueError:
+        return None
+    # the regex only accepts finite decimal numbers, so anything else must take its path
+    if pts.shape != (n, 3) or not np.isfinite(pts).all():
+        return None
+    return pts
 
 
 def parse_datapoints_from_text(text: str):
     """Parse the new 'Data Points:' section where each data point is a line like:
     "  x: 1.4617, y: 7.12916, rssi: -63"
 
-    Returns lists (x_list, y_list, rssi_list).
+    The section ends at the first blank line or at the 'Clusters:' header.
+    Returns float64 arrays (x, y, rssi), or (None, None, None) if there are no data points.
     """
-    pts = []
-    # locate the Data Points: section start
-    start = None
-    for i, raw in enumerate(text.splitlines()):
-        if raw.strip().lower().startswith('data points:'):
-            start = i + 1
-            break
-    if start is None:
+    # locate the Data Points: section start; the header match ends on the newline before the first point
+    m = _DATA_POINTS_HEADER_RE.search(text)
+    if m is None:
         return None, None, None
 
-    dp_re = re.compile(r"x\s*:\s*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)\s*,\s*y\s*:\s*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)\s*,\s*rssi\s*:\s*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)")
-    for raw in text.splitlines()[start:]:
-        if not raw.strip():
-            break
-        m = dp_re.search(raw)
-        if m:
-            try:
-                x = float(m.group(1)); y = float(m.group(2)); r = float(m.group(3))
-                pts.append((x, y, r))
-            except Exception:
-                continue
-        else:
-            # stop if we reach the Clusters: section
-            if raw.strip().lower().startswith('clusters:'):
-                break
-
-    if not pts:
-        return None, None, None
-    xs = [p[0] for p in pts]
-    ys = [p[1] for p in pts]
-    rss = [p[2] for p in pts]
-    return xs, ys, rss
+    # bound the block once
+    stop = _DATA_POINTS_END_RE.search(text, m.end())
+    end = stop.start() if stop else len(text)
+    pts = _labelled_rows(text[m.end() + 1:end])
+    if pts is None:
+        # not the plain program layout: pull every triple out of the block in a single findall
+        matches = _DATA_POINT_RE.findall(text, m.end(), end)
+        if not matches:
+            return None, None, None
+        pts = np.array(matches, dtype=np.float64)
+    return pts[:, 0], pts[:, 1], pts[:, 2]
 
 
 def extract_resulting_point(text: str):
@@ -355,13 +473,8 @@ def extract_resulting_point(text: str):
     Returns (x, y) as floats or None if not found.
     """
     # Try multiple variants, be permissive about spacing and wording
-    patterns = [
-        r"Resulting point[^\n\r]*x\s*=\s*([+-]?\d+\.?\d*)\s*,\s*y\s*=\s*([+-]?\d+\.?\d*)",
-        r"Resulting point[^\n\r]*:\s*x\s*=\s*([+-]?\d+\.?\d*)\s*,\s*y\s*=\s*([+-]?\d+\.?\d*)",
-        r"x\s*=\s*([+-]?\d+\.?\d*)\s*,\s*y\s*=\s*([+-]?\d+\.?\d*)\s*#?\s*Resulting",
-    ]
-    for pat in patterns:
-        m = re.search(pat, text, re.IGNORECASE)
+    for pat in _RESULT_PATTERNS:
+        m = pat.search(text)
         if m:
             try:
                 xv = float(m.group(1))
@@ -377,11 +490,8 @@ def extract_source_point_from_text(text: str):
     'Source position from file: x=-0.5422806643, y=-11.24231094' or without comma.
     Return (x, y) in projected coordinates if found, else None.
     """
-    patterns = [
-        r"Source position from file:\s*x\s*=\s*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)\s*,?\s*y\s*=\s*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?)",
-    ]
-    for pat in patterns:
-        m = re.search(pat, text)
+    for pat in _SOURCE_PATTERNS:
+        m = pat.search(text)
         if m:
             try:
                 xv = float(m.group(1))
@@ -392,10 +502,20 @@ def extract_source_point_from_text(text: str):
     return None
 
 
-def plot_2d(x, y, centroids=None, aoas=None, weights=None, result_point=None, out_dir=None, show=True, source_point=None):
+def plot_2d(x, y, centroids=None, aoas=None, weights=None, result_point=None, out_dir=None, show=True, source_point=None, show_path=True):
+    plt = _import_pyplot(show)
+    # convert every input once; the branches below only work on these arrays
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
     fig, ax = plt.subplots(figsize=(8, 6))
-    ax.scatter(x, y, c='C0', label='points')
-    ax.plot(x, y, c='C1', linestyle='-', linewidth=1, label='path')
+    if len(x) < HEXBIN_THRESHOLD:
+        # uniform style, so a marker-only line is enough (much cheaper than a scatter collection)
+        ax.plot(x, y, 'o', color='C0', label='points', rasterized=True)
+    else:
+        # too many points for a readable (and fast) scatter; draw their density instead
+        ax.hexbin(x, y, gridsize=200, cmap='Greys', mincnt=1, label='points', rasterized=True)
+    if show_path:
+        ax.plot(x, y, c='C1', linestyle='-', linewidth=1, label='path', rasterized=True)
     ax.set_xlabel('x (meters)')
     ax.set_ylabel('y (meters)')
     ax.set_title('Signal measurement points (x, y)')
@@ -404,19 +524,17 @@ def plot_2d(x, y, centroids=None, aoas=None, weights=None, result_point=None, ou
 
     if centroids is not None:
         cx, cy = centroids
-        cx = np.array(cx)
-        cy = np.array(cy)
+        cx = np.asarray(cx, dtype=np.float64)
+        cy = np.asarray(cy, dtype=np.float64)
         ax.scatter(cx, cy, marker='X', c='C3', s=80, label='centroids')
         if aoas is not None:
-            angles = np.array(aoas)
+            angles = np.asarray(aoas, dtype=np.float64)
             # compute arrow length relative to data extent
-            xr = max(x) - min(x) if len(x) > 1 else 1.0
-            yr = max(y) - min(y) if len(y) > 1 else 1.0
+            xr = np.ptp(x) if len(x) > 1 else 1.0
+            yr = np.ptp(y) if len(y) > 1 else 1.0
             extent = max(xr, yr)
             arrow_len = extent * 0.08
-            rads = np.deg2rad(angles)
-            dxs = arrow_len * np.cos(rads)
-            dys = arrow_len * np.sin(rads)
+            dxs, dys = _aoa_vectors(angles, arrow_len)
             ax.quiver(cx, cy, dxs, dys, angles='xy', scale_units='xy', scale=1, color='C3', width=0.005)
 
         if weights is not None:
@@ -436,29 +554,35 @@ def plot_2d(x, y, centroids=None, aoas=None, weights=None, result_point=None, ou
 
     ax.legend()
     if out_dir:
-        fig.savefig(f"{out_dir}/plot_2d.png", dpi=200)
+        fig.savefig(f"{out_dir}/plot_2d.png", dpi=200, pil_kwargs=PNG_OPTIONS)
         print(f"Saved 2D plot to {out_dir}/plot_2d.png")
     if show:
         plt.show()
+    plt.close(fig)
 
 
-def plot_3d(x, y, rssi, result_point=None, out_dir=None, show=True, cmap='viridis', source_point=None):
-    xs = np.array(x)
-    ys = np.array(y)
-    zs = np.array(rssi)
+def plot_3d(x, y, rssi, result_point=None, out_dir=None, show=True, cmap='viridis', source_point=None, show_path=True):
+    plt = _import_pyplot(show)
+    xs = np.asarray(x, dtype=np.float64)
+    ys = np.asarray(y, dtype=np.float64)
+    zs = np.asarray(rssi, dtype=np.float64)
 
     fig = plt.figure(figsize=(9, 7))
     ax = fig.add_subplot(111, projection='3d')
 
-    p = ax.scatter(xs, ys, zs, c=zs, cmap=cmap, depthshade=True)
-    ax.plot(xs, ys, zs, color='gray', linewidth=0.8, alpha=0.6)
+    # map RSSI to RGBA once so redraws (zoom/rotate) don't re-normalize or depth-shade every point
+    norm = plt.Normalize(zs.min(), zs.max())
+    colors = plt.get_cmap(cmap)(norm(zs))
+    ax.scatter(xs, ys, zs, c=colors, depthshade=False, rasterized=True)
+    if show_path:
+        ax.plot(xs, ys, zs, color='gray', linewidth=0.8, alpha=0.6, rasterized=True)
 
     ax.set_xlabel('x (meters)')
     ax.set_ylabel('y (meters)')
     ax.set_zlabel('RSSI (dBm)')
     ax.set_title('3D plot of x, y and RSSI')
 
-    fig.colorbar(p, ax=ax, label='RSSI (dBm)')
+    fig.colorbar(plt.cm.ScalarMappable(norm=norm, cmap=cmap), ax=ax, label='RSSI (dBm)')
 
     if result_point is not None:
         rx, ry = result_point
@@ -491,29 +615,101 @@ def plot_3d(x, y, rssi, result_point=None, out_dir=None, show=True, cmap='viridi
             pass
     # vertical line at resulting point (if provided)
     if out_dir:
-        fig.savefig(f"{out_dir}/plot_3d.png", dpi=200)
+        fig.savefig(f"{out_dir}/plot_3d.png", dpi=200, pil_kwargs=PNG_OPTIONS)
         print(f"Saved 3D plot to {out_dir}/plot_3d.png")
     if show:
         plt.show()
+    plt.close(fig)
+
+def plot_rssi_2d(x, y, rssi, result_point=None, out_dir=None, show=True, cmap='viridis', source_point=None):
+    """Top-down view of the measurements colored by RSSI; a cheap stand-in for plot_3d when saving only."""
+    plt = _import_pyplot(show)
+    fig, ax = plt.subplots(figsize=(9, 7))
+    sc = ax.scatter(x, y, c=rssi, cmap=cmap, s=15, rasterized=True)
+    fig.colorbar(sc, ax=ax, label='RSSI (dBm)')
+
+    if result_point is not None:
+        rx, ry = result_point
+        ax.scatter([rx], [ry], marker='*', c='gold', s=140, edgecolors='black', label='result')
+    if source_point is not None:
+        sx, sy = source_point
+        ax.scatter([sx], [sy], marker='P', c='red', s=120, edgecolors='black', label='source')
+
+    ax.set_xlabel('x (meters)')
+    ax.set_ylabel('y (meters)')
+    ax.set_title('RSSI at measurement points (x, y)')
+    ax.grid(True, linestyle='--', alpha=0.5)
+    ax.set_aspect('equal', adjustable='box')
+    if result_point is not None or source_point is not None:
+        ax.legend()
+
+    if out_dir:
+        fig.savefig(f"{out_dir}/plot_rssi_2d.png", dpi=200, pil_kwargs=PNG_OPTIONS)
+        print(f"Saved 2D RSSI plot to {out_dir}/plot_rssi_2d.png")
+    if show:
+        plt.show()
+    plt.close(fig)
+
+def _label_clusters_in_view(ax, cxs, cys, labels, max_labels=MAX_CLUSTER_LABELS):
+    """Label the centroids inside the current view, but only while at most max_labels are visible.
+    The labels are rebuilt whenever the view limits change, so zooming in reveals them.
+    """
+    texts = []
+
+    def update(_ax=None):
+        for t in texts:
+            t.remove()
+        texts.clear()
+        x0, x1 = sorted(ax.get_xlim())
+        y0, y1 = sorted(ax.get_ylim())
+        inside = np.flatnonzero((cxs >= x0) & (cxs <= x1) & (cys >= y0) & (cys <= y1))
+        if len(inside) <= max_labels:
+            texts.extend(ax.text(cxs[i], cys[i], labels[i], fontsize=9) for i in inside)
+
+    update()
+    ax.callbacks.connect('xlim_changed', update)
+    ax.callbacks.connect('ylim_changed', update)
+
+
+def _constrain_layout_if_it_fits(fig):
+    """Run fig's constrained layout once and drop it if the decorations leave no room for the axes.
+
+    Matplotlib would otherwise warn on every draw and keep the unadjusted positions anyway.
+    """
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        fig.get_layout_engine().execute(fig)
+    if any('constrained_layout not applied' in str(w.message) for w in caught):
+        fig.set_layout_engine('none')
+
 
 def plot_clusters(clusters, result_point=None, out_dir=None, show=True, source_point=None):
     # create a simple clusters-only plot saved to disk
         try:
-            fig, ax = plt.subplots(figsize=(8, 8))
+            plt = _import_pyplot(show)
+            fig, ax = plt.subplots(figsize=(8, 8), constrained_layout=True)
             colors = plt.get_cmap('tab10')
-            xs = []
-            ys = []
-            for cidx, c in enumerate(clusters):
-                pts = c.get('points', [])
-                if pts:
-                    px = [p[0] for p in pts]
-                    py = [p[1] for p in pts]
-                    xs.extend(px); ys.extend(py)
-                    ax.scatter(px, py, color=colors(cidx % 10), alpha=0.7, label=f'cluster {c.get("id")}')
-                cx = c.get('centroid_x', 0.0)
-                cy = c.get('centroid_y', 0.0)
-                ax.scatter([cx], [cy], marker='x', color='k')
-                ax.text(cx, cy, f'c{c.get("id")} r={c.get("ratio",0.0):.2f}\nw={c.get("weight",0.0):.2f}', fontsize=9)
+            # flatten all cluster points into one array so they are drawn as a single collection
+            pts = [np.asarray(c.get('points', []), dtype=np.float64).reshape(-1, 2) for c in clusters]
+            counts = [len(p) for p in pts]
+            all_pts = np.concatenate(pts) if pts else np.empty((0, 2))
+            ids = np.repeat(np.arange(len(clusters)), counts) % 10
+            if len(all_pts):
+                ax.scatter(all_pts[:, 0], all_pts[:, 1], c=ids, cmap=colors, vmin=-0.5, vmax=9.5, alpha=0.7, rasterized=True)
+            # the points are one collection, so give each cluster with points its own legend proxy
+            from matplotlib.lines import Line2D
+            cluster_handles = [Line2D([], [], linestyle='none', marker='o', color=colors(cidx % 10), alpha=0.7,
+                                      label=f'cluster {c.get("id")}')
+                               for cidx, (c, n) in enumerate(zip(clusters, counts)) if n]
+            many_clusters = len(cluster_handles) > MAX_LEGEND_CLUSTERS
+            if many_clusters:
+                hidden = len(cluster_handles) - MAX_LEGEND_CLUSTERS
+                cluster_handles = cluster_handles[:MAX_LEGEND_CLUSTERS]
+                cluster_handles.append(Line2D([], [], linestyle='none', label=f'… {hidden} more clusters'))
+            cxs = np.array([c.get('centroid_x', 0.0) for c in clusters], dtype=np.float64)
+            cys = np.array([c.get('centroid_y', 0.0) for c in clusters], dtype=np.float64)
+            ax.scatter(cxs, cys, marker='x', color='k')
+            labels = [f'c{c.get("id")} r={c.get("ratio",0.0):.2f}\nw={c.get("weight",0.0):.2f}' for c in clusters]
             if result_point is not None:
                 rx, ry = result_point
                 ax.scatter([rx], [ry], marker='*', c='gold', s=140, label='result')
@@ -523,55 +719,79 @@ def plot_clusters(clusters, result_point=None, out_dir=None, show=True, source_p
                     ax.scatter([sx], [sy], marker='P', c='red', s=120, label='source')
                 except Exception:
                     pass
-            if xs and ys:
+            if len(all_pts):
                 ax.set_aspect('equal', adjustable='box')
             ax.set_xlabel('X (meters)')
             ax.set_ylabel('Y (meters)')
             ax.grid(True)
-            ax.legend(loc='best')
-            fig.tight_layout()
+            handles, _ = ax.get_legend_handles_labels()
+            if many_clusters:
+                # the clusters fill the view, so keep the legend beside the axes instead of over them
+                ax.legend(handles=cluster_handles + handles, loc='upper left', bbox_to_anchor=(1.02, 1))
+            else:
+                ax.legend(handles=cluster_handles + handles, loc='best')
+            _label_clusters_in_view(ax, cxs, cys, labels)
+            _constrain_layout_if_it_fits(fig)
             if out_dir is not None:
-                fig.savefig(f"{out_dir}/plot_clusters.png", dpi=150)
+                fig.savefig(f"{out_dir}/plot_clusters.png", dpi=150, pil_kwargs=PNG_OPTIONS)
                 print(f"Saved clusters plot to {out_dir}/plot_clusters.png")
             # plot source on cluster plot if available
             if show:
                 plt.show()
+            plt.close(fig)
         except Exception as e:
             print(f"Failed to generate clusters plot: {e}", file=sys.stderr)
 
 
-def main():
-    import argparse
+def read_stdin(chunk_size: int = 1 << 20) -> str:
+    """Read all of stdin as raw bytes in large chunks and decode once.
 
-    parser = argparse.ArgumentParser(description='Parse arrays from stdin and plot.')
-    parser.add_argument('--no-show', action='store_true', help='Do not show interactive windows')
-    parser.add_argument('--out-dir', default=None, help='Output directory or prefix for saved plots (default: don\'t save)')
-    parser.add_argument('--cmap', default='viridis', help='Colormap for 3D RSSI plot')
-    parser.add_argument('--save-images', action='store_true', help='Save images to directory images/ if not specified otherwise')
-    args = parser.parse_args()
+    Avoids the line-oriented text layer of sys.stdin for large pipe output.
+    """
+    buf = bytearray()
+    stream = sys.stdin.buffer
+    while True:
+        chunk = stream.read1(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+    return buf.decode('utf-8', 'replace')
 
-    # read stdin fully
-    text = sys.stdin.read()
-    if not text:
-        print('No input received on stdin. Expecting variable assignments like `x = [..]` or cluster blocks.')
-        return
 
+def _alias_png(src: str, dst: str):
+    """Write a copy of the image src to dst.
+
+    A copy rather than a link: a later run saving a different image to dst must not overwrite src.
+    """
+    import os
+    import shutil
+    if os.path.exists(src):
+        shutil.copyfile(src, dst)
+
+
+def plot_text(text: str, out_dir=None, show=True, cmap='viridis', show_path=True, rssi_3d=False, contour=False):
+    """Parse one complete program output and produce all plots it contains.
+
+    When only saving (show=False) the RSSI values are drawn with plot_rssi_2d instead of
+    plot_3d, unless rssi_3d is set; plot_3d.png is then written as a copy of plot_rssi_2d.png
+    so consumers of the old file name keep working.
+    """
     # Parse new Data Points block (preferred)
     x, y, rssi = parse_datapoints_from_text(text)
     if x is None or y is None:
         print('Missing Data Points section in input; nothing to plot.')
         return
+    # convert once here so the plot functions only ever see float arrays
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    rssi = np.asarray(rssi, dtype=np.float64)
 
     # Parse clusters in the new format
     clusters = parse_clusters_from_text(text)
-    clusterx = [c.get('centroid_x') for c in clusters] if clusters else None
-    clustery = [c.get('centroid_y') for c in clusters] if clusters else None
-    aoas = [c.get('estimated_aoa') for c in clusters] if clusters else None
-    weights = [c.get('weight') for c in clusters] if clusters else None
-
-    show = not args.no_show
-    if args.out_dir is None and args.save_images:
-        args.out_dir = "images"
+    clusterx = clustery = aoas = weights = None
+    if clusters:
+        # every parsed cluster carries these keys, so unpack them column-wise in one pass
+        clusterx, clustery, aoas, weights = zip(*map(_CENTROID_FIELDS, clusters))
 
     # 2D plot
     centroids = None
@@ -583,27 +803,143 @@ def main():
 
     source_point = extract_source_point_from_text(text)
 
-    # Always save the core plots
-    plot_2d(x, y, centroids=centroids, aoas=aoas, weights=weights, result_point=result_point, out_dir=args.out_dir, show=show, source_point=source_point)
+    # Parse search space costs (if present)
+    X, Y, Z = parse_search_space_costs(text)
+
+    if not show and not out_dir:
+        # nothing would be displayed or saved, so don't even load matplotlib
+        print(f"Parsed {len(x)} data points and {len(clusters)} clusters; nothing to plot without a window or --out-dir.")
+        return
 
-    # 3D plot if rssi present
-    if rssi is not None:
-        plot_3d(x, y, rssi, result_point=result_point, out_dir=args.out_dir, show=show, cmap=args.cmap, source_point=source_point)
+    _import_pyplot(show)
+    show_path = show_path and len(x) <= PATH_MAX_POINTS
+
+    # Always save the core plots
+    plot_2d(x, y, centroids=centroids, aoas=aoas, weights=weights, result_point=result_point, out_dir=out_dir, show=show, source_point=source_point, show_path=show_path)
+
+    # 3D plot if rssi present; a saved 3D scatter adds little over a flat RSSI-colored one
+    if rssi is not None and not show and not rssi_3d:
+        plot_rssi_2d(x, y, rssi, result_point=result_point, out_dir=out_dir, show=show, cmap=cmap, source_point=source_point)
+        if out_dir is not None:
+            _alias_png(f"{out_dir}/plot_rssi_2d.png", f"{out_dir}/plot_3d.png")
+    elif rssi is not None:
+        plot_3d(x, y, rssi, result_point=result_point, out_dir=out_dir, show=show, cmap=cmap, source_point=source_point, show_path=show_path)
     # Extract source position if printed in stdout from the app
 
     # Parse and plot cluster-specific output (if present in stdin)
     if clusters:
-        plot_clusters(clusters, result_point=result_point, out_dir=args.out_dir, show=show, source_point=source_point)
+        plot_clusters(clusters, result_point=result_point, out_dir=out_dir, show=show, source_point=source_point)
 
-    # Parse and plot search space costs (if present)
-    X, Y, Z = parse_search_space_costs(text)
+    # Plot search space costs (if present)
     if X is not None:
-        plot_heatmap(X, Y, Z, out_dir=args.out_dir, show=show)
-        plot_3d_surface(X, Y, Z, out_dir=args.out_dir, show=show)
+        plot_heatmap(X, Y, Z, out_dir=out_dir, show=show, contour=contour)
+        plot_3d_surface(X, Y, Z, out_dir=out_dir, show=show)
         
         # Composite plots
-        plot_composite_heatmap(X, Y, Z, x, y, centroids=centroids, aoas=aoas, weights=weights, result_point=result_point, source_point=source_point, out_dir=args.out_dir, show=show)
-        plot_composite_3d_surface(X, Y, Z, result_point=result_point, source_point=source_point, out_dir=args.out_dir, show=show)
+        plot_composite_heatmap(X, Y, Z, x, y, centroids=centroids, aoas=aoas, weights=weights, result_point=result_point, source_point=source_point, out_dir=out_dir, show=show, contour=contour)
+        plot_composite_3d_surface(X, Y, Z, result_point=result_point, source_point=source_point, out_dir=out_dir, show=show)
+
+
+def serve(sock_path: str, out_dir: str, cmap='viridis', show_path=True, rssi_3d=False, contour=False):
+    """Keep matplotlib loaded and plot every document sent to a Unix socket.
+
+    Each connection is one program output (read until the client closes it);
+    its plots are saved to <out_dir>/<n>/ where n counts documents from 0.
+    Example client: ./build/signal-triangulation ... | nc -N -U plots.sock
+    """
+    import os
+    import shutil
+    import signal
+    import socket
+    import stat
+
+    # save-only: never touch a GUI backend
+    _import_pyplot(show=False)
+    if os.path.lexists(sock_path):
+        # only replace a stale socket, never a file given by mistake
+        if not stat.S_ISSOCK(os.lstat(sock_path).st_mode):
+            print(f"Error: {sock_path} exists and is not a socket", file=sys.stderr)
+            sys.exit(1)
+        os.unlink(sock_path)
+
+    def _terminate(signum, frame):
+        raise SystemExit(0)
+
+    # make SIGTERM run the cleanup below like Ctrl+C does
+    signal.signal(signal.SIGTERM, _terminate)
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    srv.bind(sock_path)
+    srv.listen(1)
+    print(f"Listening on {sock_path}, saving plots under {out_dir}/")
+    doc = 0
+    try:
+        while True:
+            conn, _ = srv.accept()
+            buf = bytearray()
+            with conn:
+                while True:
+                    chunk = conn.recv(1 << 20)
+                    if not chunk:
+                        break
+                    buf += chunk
+            if not buf:
+                continue
+            doc_dir = os.path.join(out_dir, str(doc))
+            created = not os.path.isdir(doc_dir)
+            os.makedirs(doc_dir, exist_ok=True)
+            ok = False
+            try:
+                plot_text(buf.decode('utf-8', 'replace'), out_dir=doc_dir, show=False, cmap=cmap, show_path=show_path, rssi_3d=rssi_3d, contour=contour)
+                ok = True
+            except Exception as e:
+                print(f"Failed to plot document {doc}: {e}", file=sys.stderr)
+            finally:
+                # drop this document's figures before the next one arrives
+                plt.close('all')
+            # keep <out_dir>/<n>/ only for documents that were plotted
+            if created and not (ok and os.listdir(doc_dir)):
+                shutil.rmtree(doc_dir, ignore_errors=True)
+            doc += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.close()
+        if os.path.lexists(sock_path):
+            os.unlink(sock_path)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Parse arrays from stdin and plot.')
+    parser.add_argument('--no-show', action='store_true', help='Do not show interactive windows')
+    parser.add_argument('--out-dir', default=None, help='Output directory or prefix for saved plots (default: don\'t save)')
+    parser.add_argument('--cmap', default='viridis', help='Colormap for 3D RSSI plot')
+    parser.add_argument('--save-images', action='store_true', help='Save images to directory images/ if not specified otherwise')
+    parser.add_argument('--no-path', action='store_true', help=f'Do not connect the measurement points with a path line (always omitted above {PATH_MAX_POINTS} points)')
+    parser.add_argument('--rssi-3d', action='store_true', help='With --no-show, still render the 3D RSSI plot instead of the flat 2D one '
+                        '(otherwise plot_3d.png is a copy of plot_rssi_2d.png)')
+    parser.add_argument('--contour', action='store_true', help='Draw the cost heatmaps as filled contours instead of images (slower)')
+    parser.add_argument('--batch', action='store_true', help='Save PNGs with fast, light compression (bigger files, much quicker to write)')
+    parser.add_argument('--server', metavar='SOCK', default=None, help='Listen on Unix socket SOCK and plot every document sent to it (implies --no-show)')
+    args = parser.parse_args()
+
+    if args.out_dir is None and args.save_images:
+        args.out_dir = "images"
+    if args.batch:
+        PNG_OPTIONS['compress_level'] = 1
+
+    if args.server:
+        serve(args.server, args.out_dir or "images", cmap=args.cmap, show_path=not args.no_path, rssi_3d=args.rssi_3d, contour=args.contour)
+        return
+
+    # read stdin fully
+    text = read_stdin()
+    if not text:
+        print('No input received on stdin. Expecting variable assignments like `x = [..]` or cluster blocks.')
+        return
+
+    plot_text(text, out_dir=args.out_dir, show=not args.no_show, cmap=args.cmap, show_path=not args.no_path, rssi_3d=args.rssi_3d, contour=args.contour)
 
 if __name__ == '__main__':
     main()
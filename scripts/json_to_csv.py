@@ -7,13 +7,104 @@ Usage:
     python scripts/json_to_csv.py Recordings/*.json  # Convert all JSON files in Recordings/
 
 If output.csv is not specified, it will be created with the same name as input but .csv extension.
+
+Optional speedups: files smaller than STREAM_MIN_BYTES are decoded whole with orjson if it is
+installed (json otherwise); larger files are streamed with ijson if it is installed, so they are
+never held in memory. Neither accepts the NaN/Infinity tokens json allows, so documents using
+them are decoded with json instead.
 """
 
 import json
 import csv
+import itertools
 import sys
 import os
+from operator import itemgetter
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# With ijson, files of at least this size are streamed instead of decoded whole
+STREAM_MIN_BYTES = 64 * 1024 * 1024
+
+# With at least this many input files the conversions run in a process pool
+PARALLEL_MIN_FILES = 4
+
+
+def _loads(data):
+    """Decode a JSON document, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity; json accepts them and reports real syntax errors
+            pass
+    return json.loads(data)
+
+
+def _row_values(headers, rows):
+    """Yield each dict in rows as a tuple of its values in header order.
+
+    Follows csv.DictWriter: missing fields are written empty and unknown fields raise ValueError.
+    """
+    n = len(headers)
+    if n > 1:
+        get = itemgetter(*headers)
+    elif n == 1:
+        get = lambda row: (row[headers[0]],)
+    else:
+        # no fields (the first measurement was {}): each row is written as an empty line
+        get = lambda row: ()
+    known = set(headers)
+    for row in rows:
+        if len(row) == n:
+            # same size and every header present means exactly the header keys
+            try:
+                yield get(row)
+                continue
+            except KeyError:
+                pass
+        wrong = row.keys() - known
+        if wrong:
+            raise ValueError("dict contains fields not in fieldnames: " + ", ".join(repr(k) for k in wrong))
+        yield tuple(row.get(h, '') for h in headers)
+
+
+def _write_csv(csv_file, headers, rows):
+    """Write rows (dicts keyed by headers) to csv_file, header line first.
+
+    The rows go to a temporary file next to csv_file, which replaces it only once every row is written,
+    so an error part way through (e.g. a truncated input while streaming) never leaves a partial CSV.
+    """
+    tmp_file = f"{csv_file}.tmp"
+    try:
+        with open(tmp_file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(_row_values(headers, rows))
+        os.replace(tmp_file, csv_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def _has_measurements_key(f):
+    """Return True if the JSON document in binary file f has a top-level 'measurements' key."""
+    f.seek(0)
+    return any(prefix == '' and event == 'map_key' and value == 'measurements'
+               for prefix, event, value in ijson.parse(f))
 
 
 def json_to_csv(json_file, csv_file=None):
@@ -36,9 +127,28 @@ def json_to_csv(json_file, csv_file=None):
         csv_file = Path(csv_file)
     
     try:
-        # Read JSON
-        with open(json_path, 'r') as f:
-            data = json.load(f)
+        if IJSON_AVAILABLE and json_path.stat().st_size >= STREAM_MIN_BYTES:
+            # Stream the records straight into the CSV so the whole document is never held in memory
+            try:
+                with open(json_path, 'rb') as f:
+                    measurements = ijson.items(f, 'measurements.item', use_float=True)
+                    first = next(measurements, None)
+                    if first is None:
+                        if not _has_measurements_key(f):
+                            print(f"Warning: No 'measurements' key in {json_file}. Skipping.", file=sys.stderr)
+                            return False
+                        print(f"Warning: No measurements found in {json_file}. Skipping.", file=sys.stderr)
+                        return False
+                    _write_csv(csv_file, list(first.keys()), itertools.chain([first], measurements))
+                print(f"✓ Converted: {json_file} -> {csv_file}")
+                return True
+            except ijson.JSONError:
+                # ijson rejects NaN/Infinity too; decode whole below, which reports real syntax errors
+                pass
+
+        # Read JSON (as bytes: both decoders take them, and orjson skips a separate UTF-8 decode)
+        with open(json_path, 'rb') as f:
+            data = _loads(f.read())
         
         # Extract measurements array
         if 'measurements' not in data:
@@ -54,10 +164,7 @@ def json_to_csv(json_file, csv_file=None):
         headers = list(measurements[0].keys())
         
         # Write CSV
-        with open(csv_file, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(measurements)
+        _write_csv(csv_file, headers, measurements)
         
         print(f"✓ Converted: {json_file} -> {csv_file}")
         return True
@@ -92,7 +199,13 @@ def main():
     
     # If multiple input files, ignore output file parameter
     if len(all_files) > 1:
-        success_count = sum(1 for f in all_files if json_to_csv(str(f)))
+        paths = [str(f) for f in all_files]
+        if len(paths) >= PARALLEL_MIN_FILES:
+            # every file converts independently, so spread them over all cores
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+                success_count = sum(pool.map(json_to_csv, paths))
+        else:
+            success_count = sum(1 for f in paths if json_to_csv(f))
         print(f"\nConverted {success_count}/{len(all_files)} file(s).")
         sys.exit(0 if success_count == len(all_files) else 1)
     else:
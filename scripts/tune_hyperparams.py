@@ -19,14 +19,27 @@ Or for a single file:
 
 from __future__ import annotations
 import argparse
+import hashlib
+import heapq
+import json
+import os
 import itertools
+import math
 import subprocess
 import re
+import shlex
+import shutil
 import sys
 import random
 import signal
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+from typing import Deque, Dict, Iterable, List, Optional, Pattern, TextIO, Tuple, Any
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
+from functools import lru_cache
+from operator import itemgetter
 
 # Try to import yaml, fall back gracefully
 try:
@@ -35,21 +48,50 @@ try:
 except ImportError:
     YAML_AVAILABLE = False
 
+# Optuna is only needed for --search-mode tpe
+try:
+    import optuna
+    OPTUNA_AVAILABLE = True
+except ImportError:
+    OPTUNA_AVAILABLE = False
+
 
 # Global flag for graceful shutdown
 _interrupted = False
 _results: List[Tuple[Dict[str, Any], Optional[float]]] = []
+# Metrics of earlier runs by cache_key(); None unless --cache
+_cache: Optional[Dict[str, float]] = None
+CACHE_PATH = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "tune_hyperparams.json"
+_cache_path = CACHE_PATH
+# Files/directories the test reads without naming them on its command line (--cache-inputs)
+_cache_inputs: List[str] = []
+# Line-buffered --results-file; one JSON object per finished test
+_results_out: Optional[TextIO] = None
+# Tests run in their own session; Ctrl+C is forwarded to them
+_running: set = set()
 _minimize = True
+# --quiet: no per-test progress lines, only the summary
+_quiet = False
+
+# Printed (possibly with a [DEBUG] prefix) when a recording produced no result;
+# a plain substring test is cheaper per line than a regex search
+_NO_OUTPUT_MARKER = "No output from app for file:"
 
 
 def signal_handler(signum, frame):
     """Handle Ctrl+C gracefully."""
     global _interrupted
     if _interrupted:
-        # Second Ctrl+C, force exit
+        # Second Ctrl+C, force exit (keeping the metrics measured so far)
         print("\n\nForced exit.")
+        if _cache is not None:
+            save_cache(_cache, _cache_path)
+        for proc in list(_running):
+            _kill_group(proc, signal.SIGKILL)
         sys.exit(1)
     _interrupted = True
+    for proc in list(_running):
+        _kill_group(proc, signal.SIGINT)
     print("\n\nInterrupted! Finishing current test and reporting results...")
 
 
@@ -64,6 +106,10 @@ class ParamSpec:
     values: List[Any]
     param_type: str  # 'float', 'int', 'bool'
     
+    def __post_init__(self):
+        # Repeated values (e.g. an int range with a fractional step) would only rerun identical tests
+        self.values = list(dict.fromkeys(self.values))
+    
     @classmethod
     def from_list(cls, name: str, values: List[Any]) -> 'ParamSpec':
         """Create from explicit list of values."""
@@ -90,7 +136,6 @@ class ParamSpec:
     @classmethod
     def from_logspace(cls, name: str, start: float, end: float, num_points: int) -> 'ParamSpec':
         """Create logarithmically spaced values (useful for weights, learning rates)."""
-        import math
         log_start = math.log10(start)
         log_end = math.log10(end)
         step = (log_end - log_start) / (num_points - 1)
@@ -135,24 +180,91 @@ DEFAULT_SEARCH_SPACES: Dict[str, ParamSpec] = {
 }
 
 
-def run_eval_cmd(cmd: str, timeout: Optional[float] = None) -> Tuple[int, str]:
-    """Executes the provided shell command and captures its output."""
+def _kill_group(proc: subprocess.Popen, sig: int) -> None:
+    """Send `sig` to the session a test was started in."""
     try:
-        proc = subprocess.run(
-            cmd, 
-            shell=True, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.STDOUT, 
-            text=True, 
-            check=False,
-            timeout=timeout
-        )
-        return proc.returncode, proc.stdout
+        os.killpg(proc.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def run_eval_cmd(cmd: List[str], timeout: Optional[float] = None) -> Tuple[int, str, bool]:
+    """Executes the provided command and captures its output.
+
+    Returns (returncode, output, timed_out). A command running longer than `timeout`
+    is killed along with everything it started.
+    """
+    proc = subprocess.Popen(
+        cmd, 
+        stdout=subprocess.PIPE, 
+        stderr=subprocess.STDOUT, 
+        text=True, 
+        start_new_session=True
+    )
+    _running.add(proc)
+    try:
+        output, _ = proc.communicate(timeout=timeout or None)
+        return proc.returncode, output, False
     except subprocess.TimeoutExpired:
-        return -1, "TIMEOUT"
+        _kill_group(proc, signal.SIGKILL)
+        output, _ = proc.communicate()
+        return proc.returncode, output, True
+    finally:
+        _running.discard(proc)
+
 
+def stream_eval_cmd(cmd: List[str], metric_regex: Pattern[str],
+                    timeout: Optional[float] = None) -> Tuple[int, Optional[float], bool, bool]:
+    """Executes the provided command, scanning its output line by line.
 
-def extract_metric(output: str, metric_regex: str) -> Optional[float]:
+    Only the first metric match and whether any file failed to produce output are
+    kept, so memory use does not grow with the amount of output.
+    Returns (returncode, metric, failed, timed_out); metric is None on timeout.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        start_new_session=True  # so a timeout can kill everything the command started
+    )
+    _running.add(proc)
+    timed_out = threading.Event()
+
+    def expire():
+        timed_out.set()
+        _kill_group(proc, signal.SIGKILL)
+
+    timer = threading.Timer(timeout, expire) if timeout else None
+    if timer:
+        timer.start()
+
+    metric = None
+    failed = False
+    try:
+        with proc.stdout:
+            for line in proc.stdout:
+                if _NO_OUTPUT_MARKER in line:
+                    failed = True
+                elif metric is None:
+                    match = metric_regex.search(line)
+                    if match:
+                        try:
+                            metric = float(match.group(1))
+                        except (ValueError, IndexError):
+                            pass
+        rc = proc.wait()
+    finally:
+        _running.discard(proc)
+        if timer:
+            timer.cancel()
+
+    if timed_out.is_set():
+        return rc, None, failed, True
+    return rc, metric, failed, False
+
+
+def extract_metric(output: str, metric_regex: Pattern[str]) -> Optional[float]:
     """Extracts a float metric from a string using regex.
     
     Returns None if:
@@ -160,10 +272,10 @@ def extract_metric(output: str, metric_regex: str) -> Optional[float]:
     - Any file failed to produce output
     """
     # Check for failed files first (handles [DEBUG] prefix)
-    if re.search(r"No output from app for file:", output):
+    if _NO_OUTPUT_MARKER in output:
         return None
     
-    match = re.search(metric_regex, output)
+    match = metric_regex.search(output)
     if match:
         try:
             return float(match.group(1))
@@ -200,146 +312,351 @@ def load_search_space_from_yaml(yaml_path: str) -> Dict[str, ParamSpec]:
     return search_space
 
 
-def build_command(base_cmd: str, params: Dict[str, Any]) -> str:
-    """Build full command with parameters."""
+@lru_cache(maxsize=None)
+def cli_flag(name: str) -> str:
+    """Command-line flag for a parameter name (coalition_distance -> --coalition-distance)."""
+    return f"--{name.replace('_', '-')}"
+
+
+def build_command(base_cmd: List[str], params: Dict[str, Any]) -> List[str]:
+    """Build full argv with parameters."""
     param_args = []
     for name, value in params.items():
-        cli_name = f"{name.replace('_', '-')}"
-        param_args.append(f"--{cli_name} {value}")
-    return f"{base_cmd} {' '.join(param_args)}"
+        param_args += [cli_flag(name), str(value)]
+    return base_cmd + param_args
 
 
-def grid_search(
-    search_space: Dict[str, ParamSpec],
-    base_cmd: str,
-    metric_regex: str,
-    max_tests: Optional[int],
+def evaluate(cmd: List[str], metric_regex: Pattern[str], cmd_timeout: Optional[float], repeat: int = 1,
+             capture_full_output: bool = False) -> Tuple[Optional[float], List[str]]:
+    """Run one configuration `repeat` times.
+
+    Returns the averaged metric (None if no run produced one or any run had failed files)
+    and the progress messages to print for it.
+    """
+    messages = []
+    metrics = []
+    for rep in range(repeat):
+        if capture_full_output:
+            rc, output, timed_out = run_eval_cmd(cmd, cmd_timeout)
+            failed = _NO_OUTPUT_MARKER in output
+            metric = None if failed or timed_out else extract_metric(output, metric_regex)
+        else:
+            rc, metric, failed, timed_out = stream_eval_cmd(cmd, metric_regex, cmd_timeout)
+        # Check for failed files
+        if failed:
+            messages.append(f"-> INVALID: Some files failed to produce output (run {rep+1}/{repeat})")
+            return None, messages  # Don't average if any run fails
+        if metric is not None:
+            metrics.append(metric)
+        else:
+            if timed_out:
+                messages.append(f"-> TIMEOUT after {cmd_timeout:g}s (run {rep+1}/{repeat})")
+            else:
+                messages.append(f"-> Metric: N/A (rc={rc}) (run {rep+1}/{repeat})")
+
+    avg_metric = sum(metrics) / len(metrics) if metrics else None
+    if avg_metric is not None:
+        messages.append(f"-> Average Metric: {avg_metric:.4f} (from {len(metrics)} runs)")
+    else:
+        messages.append(f"-> Average Metric: N/A")
+    return avg_metric, messages
+
+
+def run_tests(
+    configs: Iterable[Dict[str, Any]],
+    total: int,
+    base_cmd: List[str],
+    metric_regex: Pattern[str],
     dry_run: bool,
     cmd_timeout: Optional[float],
-    repeat: int = 1,  # NEW
+    repeat: int = 1,
+    jobs: int = 1,
+    capture_full_output: bool = False,
 ) -> List[Tuple[Dict[str, Any], Optional[float]]]:
-    """Exhaustive grid search over all combinations, averaging metric over `repeat` runs."""
+    """Evaluate each configuration, running up to `jobs` of them at the same time.
+
+    Results are recorded in `_results` in configuration order. Configurations with a
+    metric in `_cache` are not rerun, and new metrics are added to it.
+    """
     global _interrupted, _results
     _results = []
 
-    param_names = list(search_space.keys())
-    all_values = [search_space[name].values for name in param_names]
-    all_combinations = list(itertools.product(*all_values))
+    def record(params: Dict[str, Any], metric: Optional[float]):
+        _results.append((params, metric))
+        if _results_out is not None:
+            _results_out.write(json.dumps({"params": params, "metric": metric}) + "\n")
+
+    # the work happens in the child processes, so threads are enough to overlap them
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        pending: Deque[Tuple[int, Dict[str, Any], Optional[str], Future]] = deque()
+
+        def finish_oldest():
+            i, params, key, future = pending.popleft()
+            avg_metric, messages = future.result()
+            prefix = f"  [{i+1}]" if jobs > 1 else " "
+            if not _quiet:
+                for message in messages:
+                    print(f"{prefix} {message}")
+            record(params, avg_metric)
+            if key is not None and avg_metric is not None:
+                _cache[key] = avg_metric
+
+        for i, params in enumerate(configs):
+            if _interrupted:
+                if not _quiet:
+                    print(f"\nStopped after {i} tests.")
+                break
+
+            cmd = build_command(base_cmd, params)
+
+            if not _quiet:
+                param_str = ", ".join(f"{k}={v}" for k, v in params.items())
+                print(f"[{i+1}/{total}] {param_str}")
+
+            if dry_run:
+                print(f"  CMD: {shlex.join(cmd)}")
+                continue
+
+            key = cache_key(cmd, metric_regex, repeat, _cache_inputs) if _cache is not None else None
+            if key is not None and key in _cache:
+                if not _quiet:
+                    prefix = f"  [{i+1}]" if jobs > 1 else " "
+                    print(f"{prefix} -> Cached Metric: {_cache[key]:.4f}")
+                record(params, _cache[key])
+                continue
+
+            pending.append((i, params, key,
+                            pool.submit(evaluate, cmd, metric_regex, cmd_timeout, repeat, capture_full_output)))
+            while len(pending) >= max(1, jobs):
+                finish_oldest()
+
+        # tests already started always run to completion
+        while pending:
+            finish_oldest()
 
-    if max_tests and max_tests > 0:
-        all_combinations = all_combinations[:max_tests]
+    return _results
 
-    total = len(all_combinations)
-    print(f"Grid Search: {total} combinations to test")
-    print(f"Parameters: {param_names}")
-    print("(Press Ctrl+C to stop early and see results so far)")
-    print()
 
-    for i, combo in enumerate(all_combinations):
-        if _interrupted:
-            print(f"\nStopped after {i} tests.")
-            break
+def _input_stamps(paths: Iterable[str]) -> List[Any]:
+    """(path, mtime, size) of each file, walking directories; missing paths are recorded as such."""
+    stamps = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    full = os.path.join(root, name)
+                    st = os.stat(full)
+                    stamps.append([full, st.st_mtime_ns, st.st_size])
+        elif os.path.exists(path):
+            st = os.stat(path)
+            stamps.append([path, st.st_mtime_ns, st.st_size])
+        else:
+            stamps.append([path, None, None])
+    return stamps
 
-        params = dict(zip(param_names, combo))
-        cmd = build_command(base_cmd, params)
 
-        param_str = ", ".join(f"{k}={v}" for k, v in params.items())
-        print(f"[{i+1}/{total}] {param_str}")
+def cache_key(cmd: List[str], metric_regex: Pattern[str], repeat: int, inputs: Iterable[str] = ()) -> str:
+    """Key for a test's result.
 
-        if dry_run:
-            print(f"  CMD: {cmd}")
-            continue
+    Changes when the binary or any file named in `cmd` is modified, or anything under
+    `inputs`. Files the test loads implicitly (such as the recordings GlobalSummary
+    reads) are only covered if they are listed in `inputs`.
+    """
+    mtimes = [os.path.getmtime(arg) for arg in cmd if os.path.isfile(arg)]
+    parts = [cmd, metric_regex.pattern, repeat, mtimes]
+    if inputs:
+        parts.append(_input_stamps(inputs))
+    key = json.dumps(parts)
+    return hashlib.sha256(key.encode()).hexdigest()
 
-        has_failed = False
-        metrics = []
-        for rep in range(repeat):
-            rc, output = run_eval_cmd(cmd, cmd_timeout)
-            # Check for failed files
-            if re.search(r"No output from app for file:", output):
-                print(f"  -> INVALID: Some files failed to produce output (run {rep+1}/{repeat})")
-                has_failed = True
-                break  # Don't average if any run fails
-            metric = extract_metric(output, metric_regex)
-            if metric is not None:
-                metrics.append(metric)
-            else:
-                print(f"  -> Metric: N/A (rc={rc}) (run {rep+1}/{repeat})")
 
-        if has_failed:
-            _results.append((params, None))
-            continue
+def load_cache(path: Path = CACHE_PATH) -> Dict[str, float]:
+    """Load cached metrics, starting empty if the cache is missing or unreadable."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache: Dict[str, float], path: Path = CACHE_PATH) -> None:
+    """Write cached metrics, replacing the file atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def combination_at(all_values: List[List[Any]], index: int) -> Tuple[Any, ...]:
+    """The `index`-th combination in itertools.product(*all_values) order."""
+    combo = []
+    for values in reversed(all_values):
+        index, i = divmod(index, len(values))
+        combo.append(values[i])
+    return tuple(reversed(combo))
+
+
+def uniform_indices(total: int, num_samples: int, rng: random.Random) -> List[int]:
+    """`num_samples` distinct grid indices drawn uniformly from range(total)."""
+    if total <= sys.maxsize:
+        return rng.sample(range(total), num_samples)
+    # rng.sample needs len() of the range, which overflows past sys.maxsize; on a grid
+    # that large collisions are rare, so redrawing the odd duplicate is cheap
+    indices: Dict[int, None] = {}
+    while len(indices) < num_samples:
+        indices[rng.randrange(total)] = None
+    return list(indices)
+
+
+def latin_hypercube_indices(sizes: List[int], num_samples: int, rng: random.Random) -> List[int]:
+    """Distinct grid indices whose per-parameter values are spread evenly.
+
+    Each column cycles through a shuffled copy of its values and is shuffled independently
+    (a Latin hypercube over the categorical axes). Combinations that collide are replaced
+    with uniform draws so the result stays without replacement.
+    """
+    columns = []
+    for size in sizes:
+        order = rng.sample(range(size), size)
+        column = [order[i % size] for i in range(num_samples)]
+        rng.shuffle(column)
+        columns.append(column)
+
+    indices: Dict[int, None] = {}
+    for combo in zip(*columns):
+        index = 0
+        for size, i in zip(sizes, combo):
+            index = index * size + i
+        indices[index] = None
+
+    total = math.prod(sizes)
+    while len(indices) < num_samples:
+        indices[rng.randrange(total)] = None
+    return list(indices)
 
-        avg_metric = sum(metrics) / len(metrics) if metrics else None
-        if avg_metric is not None:
-            print(f"  -> Average Metric: {avg_metric:.4f} (from {len(metrics)} runs)")
-        else:
-            print(f"  -> Average Metric: N/A")
-        _results.append((params, avg_metric))
 
-    return _results
+def grid_search(
+    search_space: Dict[str, ParamSpec],
+    base_cmd: List[str],
+    metric_regex: Pattern[str],
+    max_tests: Optional[int],
+    dry_run: bool,
+    cmd_timeout: Optional[float],
+    repeat: int = 1,  # NEW
+    jobs: int = 1,
+    capture_full_output: bool = False,
+) -> List[Tuple[Dict[str, Any], Optional[float]]]:
+    """Exhaustive grid search over all combinations, averaging metric over `repeat` runs."""
+    param_names = list(search_space.keys())
+    all_values = [search_space[name].values for name in param_names]
+    total = math.prod(len(values) for values in all_values)
+
+    if max_tests and max_tests > 0:
+        total = min(total, max_tests)
+
+    all_combinations = itertools.islice(itertools.product(*all_values), total)
+    if not _quiet:
+        print(f"Grid Search: {total} combinations to test")
+        print(f"Parameters: {param_names}")
+        print("(Press Ctrl+C to stop early and see results so far)")
+        print()
+
+    configs = (dict(zip(param_names, combo)) for combo in all_combinations)
+    return run_tests(configs, total, base_cmd, metric_regex, dry_run, cmd_timeout, repeat, jobs,
+                     capture_full_output)
 
 
 def random_search(
     search_space: Dict[str, ParamSpec],
-    base_cmd: str,
-    metric_regex: str,
+    base_cmd: List[str],
+    metric_regex: Pattern[str],
     num_samples: int,
     dry_run: bool,
     cmd_timeout: Optional[float],
     repeat: int = 1,  # NEW
+    jobs: int = 1,
+    capture_full_output: bool = False,
+    seed: Optional[int] = None,
+    sampler: str = 'uniform',
 ) -> List[Tuple[Dict[str, Any], Optional[float]]]:
-    """Random sampling from search space, averaging metric over `repeat` runs."""
-    global _interrupted, _results
-    _results = []
+    """Random sampling from search space, averaging metric over `repeat` runs.
 
+    Combinations are drawn without replacement, so no configuration is tested twice.
+    With sampler='lhs' every value of each parameter is used about equally often.
+    """
     param_names = list(search_space.keys())
-    print(f"Random Search: {num_samples} samples")
-    print(f"Parameters: {param_names}")
-    print("(Press Ctrl+C to stop early and see results so far)")
-    print()
-
-    for i in range(num_samples):
-        if _interrupted:
-            print(f"\nStopped after {i} tests.")
-            break
-
-        params = {name: random.choice(search_space[name].values) for name in param_names}
-        cmd = build_command(base_cmd, params)
-
-        param_str = ", ".join(f"{k}={v}" for k, v in params.items())
-        print(f"[{i+1}/{num_samples}] {param_str}")
+    all_values = [search_space[name].values for name in param_names]
+    total = math.prod(len(values) for values in all_values)
+    num_samples = min(num_samples, total)
+    if not _quiet:
+        print(f"Random Search: {num_samples} samples (of {total} combinations)")
+        print(f"Parameters: {param_names}")
+        print("(Press Ctrl+C to stop early and see results so far)")
+        print()
+
+    # sample grid indices and decode them, so the grid itself is never built
+    rng = random.Random(seed)
+    if sampler == 'lhs':
+        indices = latin_hypercube_indices([len(values) for values in all_values], num_samples, rng)
+    else:
+        indices = uniform_indices(total, num_samples, rng)
+    configs = (dict(zip(param_names, combination_at(all_values, index))) for index in indices)
+    return run_tests(configs, num_samples, base_cmd, metric_regex, dry_run, cmd_timeout, repeat, jobs,
+                     capture_full_output)
+
+
+def tpe_search(
+    search_space: Dict[str, ParamSpec],
+    base_cmd: List[str],
+    metric_regex: Pattern[str],
+    num_samples: int,
+    dry_run: bool,
+    cmd_timeout: Optional[float],
+    repeat: int = 1,
+    jobs: int = 1,
+    capture_full_output: bool = False,
+    seed: Optional[int] = None,
+) -> List[Tuple[Dict[str, Any], Optional[float]]]:
+    """Optuna TPE search, averaging metric over `repeat` runs.
 
-        if dry_run:
-            print(f"  CMD: {cmd}")
-            continue
+    Each parameter is chosen among its search-space values, so results stay comparable
+    with (and cacheable alongside) grid and random runs. Invalid runs count as failed trials.
+    """
+    param_names = list(search_space.keys())
+    if not _quiet:
+        print(f"TPE Search: {num_samples} trials")
+        print(f"Parameters: {param_names}")
+        print("(Press Ctrl+C to stop early and see results so far)")
+        print()
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.create_study(
+        direction="minimize" if _minimize else "maximize",
+        sampler=optuna.samplers.TPESampler(seed=seed),
+    )
 
-        has_failed = False
-        metrics = []
-        for rep in range(repeat):
-            rc, output = run_eval_cmd(cmd, cmd_timeout)
-            # Check for failed files
-            if re.search(r"No output from app for file:", output):
-                print(f"  -> INVALID: Some files failed to produce output (run {rep+1}/{repeat})")
-                has_failed = True
-                break  # Don't average if any run fails
-            metric = extract_metric(output, metric_regex)
-            if metric is not None:
-                metrics.append(metric)
-            else:
-                print(f"  -> Metric: N/A (rc={rc}) (run {rep+1}/{repeat})")
+    trials: List[Any] = []
+    told = 0
 
-        if has_failed:
-            _results.append((params, None))
-            continue
+    def configs():
+        nonlocal told
+        for _ in range(num_samples):
+            # _results[i] belongs to trials[i]; report finished tests before asking for the next one
+            for _, metric in _results[told:]:
+                if metric is None:
+                    study.tell(trials[told], state=optuna.trial.TrialState.FAIL)
+                else:
+                    study.tell(trials[told], metric)
+                told += 1
+            trial = study.ask()
+            trials.append(trial)
+            yield {name: trial.suggest_categorical(name, spec.values) for name, spec in search_space.items()}
 
-        avg_metric = sum(metrics) / len(metrics) if metrics else None
-        if avg_metric is not None:
-            print(f"  -> Average Metric: {avg_metric:.4f} (from {len(metrics)} runs)")
-        else:
-            print(f"  -> Average Metric: N/A")
-        _results.append((params, avg_metric))
+    return run_tests(configs(), num_samples, base_cmd, metric_regex, dry_run, cmd_timeout, repeat, jobs,
+                     capture_full_output)
 
-    return _results
 
 def report_results(results: List[Tuple[Dict[str, Any], Optional[float]]], minimize: bool = True):
     """Print summary of results."""
@@ -355,30 +672,31 @@ def report_results(results: List[Tuple[Dict[str, Any], Optional[float]]], minimi
         print("No valid results collected.")
         return
     
-    # Sort by metric
-    sorted_results = sorted(valid_results, key=lambda x: x[1], reverse=not minimize)
+    # Only the top 5 need ordering (same order as a full stable sort)
+    pick = heapq.nsmallest if minimize else heapq.nlargest
+    top_results = pick(5, valid_results, key=itemgetter(1))
     
     # Best result
-    best_params, best_metric = sorted_results[0]
-    best_args = " ".join(f"--{k.replace('_', '-')} {v}" for k, v in best_params.items())
+    best_params, best_metric = top_results[0]
+    best_args = " ".join(f"{cli_flag(k)} {v}" for k, v in best_params.items())
     
     print(f"\nBest {'(lowest)' if minimize else '(highest)'} metric: {best_metric:.6f}")
     print(f"Full Command: ./build/tests/integration_tests --gtest_filter=Triangulation.GlobalSummary {best_args}")
     
     # Top 5
-    num_to_show = min(5, len(sorted_results))
+    num_to_show = len(top_results)
     print(f"\nTop {num_to_show} configurations:")
-    for i, (params, metric) in enumerate(sorted_results[:num_to_show]):
-        param_str = " ".join(f"--{k.replace('_', '-')} {v}" for k, v in params.items())
+    for i, (params, metric) in enumerate(top_results):
+        param_str = " ".join(f"{cli_flag(k)} {v}" for k, v in params.items())
         print(f"  {i+1}. {metric:.6f} | {param_str}")
     
     # Statistics
-    metrics = [m for _, m in valid_results]
+    metrics = sorted(m for _, m in valid_results)
     print(f"\nStatistics ({len(valid_results)} valid runs):")
-    print(f"  Min:    {min(metrics):.6f}")
-    print(f"  Max:    {max(metrics):.6f}")
-    print(f"  Mean:   {sum(metrics)/len(metrics):.6f}")
-    print(f"  Median: {sorted(metrics)[len(metrics)//2]:.6f}")
+    print(f"  Min:    {metrics[0]:.6f}")
+    print(f"  Max:    {metrics[-1]:.6f}")
+    print(f"  Mean:   {math.fsum(metrics)/len(metrics):.6f}")
+    print(f"  Median: {metrics[len(metrics)//2]:.6f}")
 
 def parse_param_list(value: str, param_type: str = 'float') -> List[Any]:
     """Parse comma-separated parameter values."""
@@ -397,7 +715,7 @@ def parse_param_list(value: str, param_type: str = 'float') -> List[Any]:
 
 
 def main():
-    global _minimize
+    global _minimize, _quiet, _cache, _cache_path, _cache_inputs, _results_out
     
     p = argparse.ArgumentParser(
         description="Hyperparameter tuner for triangulation algorithm",
@@ -425,19 +743,43 @@ Press Ctrl+C during execution to stop early and see results collected so far.
     )
     
     # Required
-    p.add_argument("--eval-cmd", required=True, help="Base command to execute")
+    p.add_argument("--eval-cmd", required=True,
+                   help="Base command to execute (run without a shell; use sh -c '...' for pipes or redirects)")
     p.add_argument("--metric-regex", required=True, help="Regex to extract metric (group 1)")
     
     # Search configuration
     p.add_argument("--search-space", help="YAML file with search space definition")
-    p.add_argument("--search-mode", choices=['grid', 'random'], default='grid',
+    p.add_argument("--search-mode", choices=['grid', 'random', 'tpe'], default='grid',
                    help="Search strategy (default: grid)")
+    p.add_argument("--seed", type=int, default=None, help="Random seed for --search-mode random/tpe")
+    p.add_argument("--sampler", choices=['uniform', 'lhs'], default='uniform',
+                   help="How --search-mode random picks combinations (lhs: Latin hypercube, even per-value coverage)")
     p.add_argument("--max-tests", type=int, help="Maximum number of tests to run")
     p.add_argument("--cmd-timeout", type=float, default=300, help="Timeout per command (seconds)")
     p.add_argument("--maximize", action="store_true", help="Maximize metric instead of minimize")
+    p.add_argument("--quiet", action="store_true", help="Only print the results summary, not each test")
     p.add_argument("--dry-run", action="store_true", help="Print commands without executing")
 
     p.add_argument("--repeat", type=int, default=1, help="Repeat each test N times and average the metric")
+    p.add_argument("--jobs", type=int, default=1,
+                   help="Number of tests to run at the same time (default: 1; keep at 1 when tuning timeouts)")
+    p.add_argument("--capture-full-output", action="store_true",
+                   help="Buffer each test's whole output before matching (needed for multi-line --metric-regex)")
+    p.add_argument("--results-file",
+                   help="Append each finished test's parameters and metric to this file as JSON lines")
+    p.add_argument("--cache-path", type=Path, default=CACHE_PATH,
+                   help=f"File --cache keeps metrics of finished tests in (default: {CACHE_PATH}, "
+                        "under $XDG_CACHE_HOME if set). Cached metrics are reused until the command, "
+                        "metric regex, --repeat or a file named on the command line changes; inputs "
+                        "the test finds on its own (e.g. the recordings directory) must be listed with "
+                        "--cache-inputs. Use --clear-cache or delete the file to invalidate it by hand")
+    p.add_argument("--cache-inputs", nargs='+', default=[], metavar="PATH",
+                   help="Files or directories the test reads implicitly; editing any of them invalidates "
+                        "cached metrics")
+    p.add_argument("--cache", action="store_true",
+                   help="Reuse metrics of tests already run with the same command (off by default, since "
+                        "inputs not given with --cache-inputs can change without invalidating them)")
+    p.add_argument("--clear-cache", action="store_true", help="Forget all cached metrics before searching")
     
     # Inline parameter definitions (override defaults)
     p.add_argument("--coalition-distance", help="Values for coalition_distance")
@@ -468,6 +810,11 @@ Press Ctrl+C during execution to stop early and see results collected so far.
     
     args = p.parse_args()
     _minimize = not args.maximize
+    _quiet = args.quiet
+
+    if args.search_mode == 'tpe' and not OPTUNA_AVAILABLE:
+        print("Error: Optuna not installed. Run: pip install optuna", file=sys.stderr)
+        sys.exit(1)
     
     # Build search space
     search_space: Dict[str, ParamSpec] = {}
@@ -514,23 +861,68 @@ Press Ctrl+C during execution to stop early and see results collected so far.
         print("Example: --coalition-distance '1,2,3,4' --cluster-min-points '3,4,5'")
         sys.exit(1)
     
+    try:
+        base_cmd = shlex.split(args.eval_cmd)
+    except ValueError as e:
+        print(f"Error: Invalid --eval-cmd: {e}")
+        sys.exit(1)
+    if not base_cmd:
+        print("Error: --eval-cmd is empty")
+        sys.exit(1)
+    # a dry run only prints commands, so the binary doesn't have to be built yet
+    if not args.dry_run and shutil.which(base_cmd[0]) is None:
+        print(f"Error: --eval-cmd program not found: {base_cmd[0]}")
+        sys.exit(1)
+
+    try:
+        metric_regex = re.compile(args.metric_regex)
+    except re.error as e:
+        print(f"Error: Invalid --metric-regex: {e}")
+        sys.exit(1)
+    if metric_regex.groups < 1:
+        print("Error: --metric-regex needs a capture group for the metric value")
+        sys.exit(1)
+
+    if args.clear_cache and args.cache_path.exists():
+        args.cache_path.unlink()
+    _cache_path = args.cache_path
+    _cache_inputs = args.cache_inputs
+    if args.cache:
+        _cache = load_cache(args.cache_path)
+
+    if args.results_file and not args.dry_run:
+        _results_out = open(args.results_file, 'a', buffering=1)
+
     # Run search
     try:
         if args.search_mode == 'grid':
             results = grid_search(
-                search_space, args.eval_cmd, args.metric_regex,
-                args.max_tests, args.dry_run, args.cmd_timeout, args.repeat
+                search_space, base_cmd, metric_regex,
+                args.max_tests, args.dry_run, args.cmd_timeout, args.repeat, args.jobs,
+                args.capture_full_output
+            )
+        elif args.search_mode == 'tpe':
+            results = tpe_search(
+                search_space, base_cmd, metric_regex,
+                args.max_tests or 100, args.dry_run, args.cmd_timeout, args.repeat, args.jobs,
+                args.capture_full_output, args.seed
             )
         else:
             num_samples = args.max_tests or 100
             results = random_search(
-                search_space, args.eval_cmd, args.metric_regex,
-                num_samples, args.dry_run, args.cmd_timeout, args.repeat
+                search_space, base_cmd, metric_regex,
+                num_samples, args.dry_run, args.cmd_timeout, args.repeat, args.jobs,
+                args.capture_full_output, args.seed, args.sampler
             )
     except Exception as e:
         print(f"\nError during search: {e}")
         results = _results  # Use whatever we collected
     
+    if _cache is not None and not args.dry_run:
+        save_cache(_cache, args.cache_path)
+    if _results_out is not None:
+        _results_out.close()
+
     if not args.dry_run:
         report_results(results, minimize=_minimize)
 
@@ -0,0 +1,106 @@
+"""Tests for scripts/json_to_csv.py.
+
+Run with: python3 -m unittest discover tests/python
+"""
+
+import contextlib
+import csv
+import importlib.util
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "json_to_csv.py"
+
+spec = importlib.util.spec_from_file_location("json_to_csv", SCRIPT)
+json_to_csv = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = json_to_csv
+spec.loader.exec_module(json_to_csv)
+
+
+def dictwriter_output(headers, rows):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=headers)
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+class RowValuesTest(unittest.TestCase):
+    def write(self, headers, rows):
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(headers)
+        writer.writerows(json_to_csv._row_values(headers, rows))
+        return buf.getvalue()
+
+    def test_matches_dictwriter(self):
+        headers = ["lat", "lon", "rssi"]
+        rows = [{"lat": 1, "lon": 2, "rssi": -40}, {"lon": 3, "lat": 4}, {"rssi": -50, "lat": 5, "lon": 6}]
+        self.assertEqual(self.write(headers, rows), dictwriter_output(headers, rows))
+
+    def test_single_header(self):
+        rows = [{"rssi": -40}, {}]
+        self.assertEqual(self.write(["rssi"], rows), dictwriter_output(["rssi"], rows))
+
+    def test_empty_measurement_dict(self):
+        rows = [{}, {}]
+        self.assertEqual(self.write([], rows), dictwriter_output([], rows))
+
+    def test_unknown_field_raises(self):
+        with self.assertRaises(ValueError):
+            list(json_to_csv._row_values(["lat"], [{"lat": 1, "lon": 2}]))
+
+
+class JsonToCsvTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+    def convert(self, document):
+        json_file = self.tmp / "rec.json"
+        json_file.write_text(document)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            ok = json_to_csv.json_to_csv(str(json_file))
+        return ok, self.tmp / "rec.csv"
+
+    def test_empty_first_measurement(self):
+        ok, csv_file = self.convert(json.dumps({"measurements": [{}]}))
+        self.assertTrue(ok)
+        self.assertEqual(csv_file.read_text(), "\n\n")
+
+    def test_nan_and_infinity_tokens(self):
+        ok, csv_file = self.convert('{"measurements": [{"rssi": NaN, "lat": Infinity}, {"rssi": -40, "lat": 1}]}')
+        self.assertTrue(ok)
+        self.assertEqual(csv_file.read_text().splitlines(), ["rssi,lat", "nan,inf", "-40,1"])
+
+    def test_missing_measurements_key(self):
+        ok, csv_file = self.convert('{"other": []}')
+        self.assertFalse(ok)
+        self.assertFalse(csv_file.exists())
+
+    def test_truncated_document_leaves_existing_csv(self):
+        (self.tmp / "rec.csv").write_text("previous")
+        ok, csv_file = self.convert('{"measurements": [{"rssi": -40}, {"rssi": -4')
+        self.assertFalse(ok)
+        self.assertEqual(csv_file.read_text(), "previous")
+        self.assertEqual(sorted(p.name for p in self.tmp.iterdir()), ["rec.csv", "rec.json"])
+
+
+@unittest.skipUnless(json_to_csv.IJSON_AVAILABLE, "ijson not installed")
+class StreamingJsonToCsvTest(JsonToCsvTest):
+    """The same conversions through the ijson streaming path."""
+
+    def setUp(self):
+        super().setUp()
+        threshold = json_to_csv.STREAM_MIN_BYTES
+        json_to_csv.STREAM_MIN_BYTES = 0
+        self.addCleanup(setattr, json_to_csv, "STREAM_MIN_BYTES", threshold)
+
+
+if __name__ == "__main__":
+    unittest.main()
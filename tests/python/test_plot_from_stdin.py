@@ -0,0 +1,111 @@
+"""Tests for plotting/plot_from_stdin.py.
+
+Run with: python3 -m unittest discover tests/python
+"""
+
+import contextlib
+import importlib.util
+import io
+import sys
+import tempfile
+import unittest
+import warnings
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parents[2] / "plotting" / "plot_from_stdin.py"
+
+spec = importlib.util.spec_from_file_location("plot_from_stdin", SCRIPT)
+plot = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = plot
+spec.loader.exec_module(plot)
+
+try:
+    import matplotlib
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+
+def make_clusters(n):
+    """n clusters of three points each, laid out on a 9-column grid."""
+    clusters = []
+    for i in range(n):
+        cx, cy = 30.0 * (i % 9), 30.0 * (i // 9)
+        clusters.append({'id': i, 'centroid_x': cx, 'centroid_y': cy, 'ratio': 0.5, 'weight': 1.0,
+                         'points': [[cx, cy], [cx + 3, cy + 2], [cx - 2, cy + 4]]})
+    return clusters
+
+
+@unittest.skipUnless(MATPLOTLIB_AVAILABLE, "matplotlib not installed")
+class PlotFunctionsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out_dir = Path(tmp.name)
+
+    def run_quietly(self, func, *args, **kwargs):
+        err = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(err):
+            func(*args, **kwargs)
+        return err.getvalue()
+
+    def test_plot_clusters_without_plot_text(self):
+        # called directly, before plot_text()/serve() ever loaded pyplot
+        err = self.run_quietly(plot.plot_clusters, make_clusters(3), result_point=(1.0, 2.0),
+                               out_dir=str(self.out_dir), show=False)
+        self.assertEqual(err, "")
+        self.assertTrue((self.out_dir / "plot_clusters.png").exists())
+
+    def test_plot_clusters_many_clusters(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            err = self.run_quietly(plot.plot_clusters, make_clusters(80), result_point=(1.0, 2.0),
+                                   source_point=(3.0, 4.0), out_dir=str(self.out_dir), show=False)
+        self.assertEqual(err, "")
+        self.assertEqual([str(w.message) for w in caught], [])
+        self.assertTrue((self.out_dir / "plot_clusters.png").exists())
+
+    def test_plot_clusters_layout_that_does_not_fit(self):
+        # an uncapped 80-entry legend leaves constrained layout no room for the axes
+        cap = plot.MAX_LEGEND_CLUSTERS
+        plot.MAX_LEGEND_CLUSTERS = 1000
+        self.addCleanup(setattr, plot, "MAX_LEGEND_CLUSTERS", cap)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            err = self.run_quietly(plot.plot_clusters, make_clusters(80), out_dir=str(self.out_dir), show=False)
+        self.assertEqual(err, "")
+        self.assertEqual([str(w.message) for w in caught], [])
+        self.assertTrue((self.out_dir / "plot_clusters.png").exists())
+
+    def test_plot_2d_without_plot_text(self):
+        self.run_quietly(plot.plot_2d, [0.0, 1.0, 2.0], [0.0, 1.0, 0.5], out_dir=str(self.out_dir), show=False)
+        self.assertTrue((self.out_dir / "plot_2d.png").exists())
+
+
+@unittest.skipUnless(MATPLOTLIB_AVAILABLE, "matplotlib not installed")
+class PlotTextTest(unittest.TestCase):
+    TEXT = "Data Points:\nx: 0.0, y: 0.0, rssi: -40\nx: 1.0, y: 2.0, rssi: -50\nx: 2.0, y: 1.0, rssi: -60\n"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out_dir = Path(tmp.name)
+
+    def plot_text(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            plot.plot_text(self.TEXT, out_dir=str(self.out_dir), show=False, **kwargs)
+
+    def test_saved_rssi_plot_keeps_plot_3d_name(self):
+        self.plot_text()
+        self.assertEqual((self.out_dir / "plot_3d.png").read_bytes(), (self.out_dir / "plot_rssi_2d.png").read_bytes())
+
+    def test_rssi_3d_leaves_flat_plot_alone(self):
+        self.plot_text()
+        flat = (self.out_dir / "plot_rssi_2d.png").read_bytes()
+        self.plot_text(rssi_3d=True)
+        self.assertEqual((self.out_dir / "plot_rssi_2d.png").read_bytes(), flat)
+        self.assertNotEqual((self.out_dir / "plot_3d.png").read_bytes(), flat)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Tests for scripts/tune_hyperparams.py.
+
+Run with: python3 -m unittest discover tests/python
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "tune_hyperparams.py"
+
+spec = importlib.util.spec_from_file_location("tune_hyperparams", SCRIPT)
+tune = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = tune
+spec.loader.exec_module(tune)
+
+METRIC_REGEX = re.compile(r"Error:\s*([0-9.]+)")
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        tune._quiet = True
+        self.addCleanup(setattr, tune, "_quiet", False)
+        self.recording = self.tmp / "recordings" / "rec.json"
+        self.recording.parent.mkdir()
+        self.recording.write_text("1.5")
+        # the test program reads the recording without naming it as an argument
+        self.cmd = [sys.executable, "-c", f"print('Error:', open({str(self.recording)!r}).read())"]
+
+    def run_once(self):
+        tune._results_out = None
+        results = tune.run_tests([{"x": 1}], 1, self.cmd, METRIC_REGEX, False, 30)
+        return results[0][1]
+
+    def test_changed_input_misses_cache(self):
+        tune._cache = {}
+        tune._cache_inputs = [str(self.recording.parent)]
+        self.addCleanup(setattr, tune, "_cache", None)
+        self.addCleanup(setattr, tune, "_cache_inputs", [])
+
+        self.assertEqual(self.run_once(), 1.5)
+        self.assertEqual(len(tune._cache), 1)
+
+        self.recording.write_text("2.5")
+        st = self.recording.stat()
+        os.utime(self.recording, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        self.assertEqual(self.run_once(), 2.5)
+        self.assertEqual(len(tune._cache), 2)
+
+    def test_unchanged_input_hits_cache(self):
+        tune._cache = {}
+        tune._cache_inputs = [str(self.recording.parent)]
+        self.addCleanup(setattr, tune, "_cache", None)
+        self.addCleanup(setattr, tune, "_cache_inputs", [])
+
+        key = tune.cache_key(self.cmd + ["--x", "1"], METRIC_REGEX, 1, tune._cache_inputs)
+        tune._cache[key] = 9.0
+        self.assertEqual(self.run_once(), 9.0)
+
+    def test_cache_is_off_by_default(self):
+        env = dict(os.environ, XDG_CACHE_HOME=str(self.tmp / "cache"))
+        subprocess.run(
+            [sys.executable, str(SCRIPT), "--eval-cmd", " ".join(map(repr, self.cmd)),
+             "--metric-regex", METRIC_REGEX.pattern, "--coalition-distance", "1"],
+            env=env, check=True, capture_output=True,
+        )
+        self.assertFalse((self.tmp / "cache" / "tune_hyperparams.json").exists())
+
+
+class RandomSearchTest(unittest.TestCase):
+    def test_indices_beyond_maxsize(self):
+        total = 2 ** 64
+        self.assertGreater(total, sys.maxsize)
+        indices = tune.uniform_indices(total, 50, random.Random(0))
+        self.assertEqual(len(set(indices)), 50)
+        self.assertTrue(all(0 <= i < total for i in indices))
+
+    def test_indices_small_grid_are_a_permutation(self):
+        indices = tune.uniform_indices(10, 10, random.Random(0))
+        self.assertEqual(sorted(indices), list(range(10)))
+
+    def test_random_search_over_huge_space(self):
+        space = {f"p{i}": tune.ParamSpec.from_list(f"p{i}", [0, 1]) for i in range(64)}
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            tune.random_search(space, ["true"], METRIC_REGEX, 3, True, None, seed=0)
+        self.assertEqual(out.getvalue().count("  CMD: "), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()